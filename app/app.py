@@ -1,10 +1,15 @@
-import cadquery as cq
 import streamlit as st
+import numpy as np
 import os
 import sys
+import shutil
+import hashlib
+import tempfile
 from pathlib import Path
 import time
-from stlcreation.heartfile import  create_heart_with_text, create_text_object_with_tunable_params,test_parameters
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from streamlit_stl import stl_from_file
 
 # Initialize session state
@@ -22,6 +27,10 @@ if 'render_start_time' not in st.session_state:
     st.session_state.render_start_time = None
 
 SPECIAL_CHARS = ['♥','♦','♣','♠','♪','♫','►','◄']
+CACHE_DIR = Path('.cache') # rendered files, named after the hash of their parameters
+CACHE_VERSION = 1 # bump when the geometry changes, the old rendered files are then ignored
+MAX_CACHED_HEARTS = 32 # rendered heart files kept in the cache, the least recently used go first
+MAX_LETTER_WORKERS = 2 # every letter worker keeps cadquery loaded, a few hundred MB each
 
 def get_fonts_path():
     """Get the absolute path to the resource, works for both development and PyInstaller bundle."""
@@ -34,63 +43,152 @@ def get_fonts_path():
 
     return base_path / 'fonts'
 
-def letter(let, angle, fontPath=""):
-    """Extrude a letter, center it and rotate of the input angle"""
-    wp = (cq.Workplane('XZ')
-        .text(let, fontsize, extr, fontPath=fontPath, valign='bottom')
-        )
-    b_box = wp.combine().objects[0].BoundingBox()
-    x_shift = -(b_box.xlen/2 + b_box.xmin )
-    wp = (wp.translate([x_shift,extr/2,0])
-        .rotate((0,0,0),(0,0,1),angle)
-        )
-    return wp
+@st.cache_data
+def list_fonts(font_dir_str):
+    """List the font folders, the fonts don't change while the app is running"""
+    return sorted(f for f in os.listdir(font_dir_str) if '.' != f[0])
+
+@st.cache_data
+def list_font_types(font_dir_str, font_name, pattern='*.ttf'):
+    """List the font files of a font folder matching the glob pattern"""
+    return sorted(p.name for p in (Path(font_dir_str) / font_name).glob(pattern))
+
+@st.cache_resource
+def letter_executor():
+    """Letter workers kept alive between renders so their letter cache is reused, spawned to not fork the server"""
+    # cpu_count reports the host cores in a container, the affinity is what we may use
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=min(cpus, MAX_LETTER_WORKERS),
+                               mp_context=multiprocessing.get_context('spawn'))
+
+def prune_cache(pattern, max_files):
+    """Remove the least recently used cached files matching the pattern beyond max_files"""
+    files = []
+    for file in CACHE_DIR.glob(pattern):
+        try:
+            files.append((file.stat().st_mtime, file))
+        except FileNotFoundError: # removed by another session
+            pass
+    for _, file in sorted(files)[:-max_files]:
+        file.unlink(missing_ok=True)
+
+def export_files(shape, save='stl', export_name='file', display_name='file_display'):
+    """Export the display stl and the output file, the stl is tessellated once"""
+    import cadquery as cq
+    if save == 'stl':
+        # the output mesh is used for the display as well
+        cq.exporters.export(shape, f'{export_name}.stl', tolerance=0.1, angularTolerance=0.1)
+        shutil.copyfile(f'{export_name}.stl', f'{display_name}.stl')
+    else:
+        # a coarser mesh is enough for the display
+        cq.exporters.export(shape, f'{display_name}.stl', tolerance=0.3, angularTolerance=0.3)
+        cq.exporters.export(shape, f"{export_name}.{save}")
 
-def dual_text(text1, text2, fontPath='', 
+def dual_text(text1, text2, fontPath='', fontsize=20,
               save='stl', 
               b_h=2, b_pad=2, b_fil_per=0.8, space_per=0.3, 
               extrab_h=1, extrab_rad=2, extrab_mask='',
-              export_name='file'):
+              export_name='file', display_name='file_display'):
     print(f"DEBUG: dual_text called with text1='{text1}', text2='{text2}'")
     """Generate the dual letter illusion from the two text and save it"""
+    # cadquery loads all of OCP, import it only when rendering
+    import cadquery as cq
+    from OCP.TopoDS import TopoDS_Compound, TopoDS_Builder
+    from stlcreation.dualletter import _intersect_pair
+    extr = fontsize*2 # extrude letter
     space = fontsize*space_per # spece between letter
-    res = cq.Assembly() # start assembly
-    last_ymax = 0
-    for ind, ab in enumerate(zip(text1, text2)):
+    # collect the letters in a plain compound, no assembly metadata is needed
+    comp = TopoDS_Compound()
+    builder = TopoDS_Builder()
+    builder.MakeCompound(comp)
+    # intersect the letter pairs in parallel, they are independent
+    jobs = [(a, b, fontPath, fontsize, extr) for a, b in zip(text1, text2)]
+    if len(jobs) > 1:
         try:
-            a = letter(ab[0], 45, fontPath=fontPath)
-            b = letter(ab[1], 135, fontPath=fontPath,)
-            a_inter_b = a & b
-            b_box = a_inter_b.objects[0].BoundingBox()
-            translate_vect = [0, -b_box.ymin, 0]
-            if ind:
-                translate_vect[1] += last_ymax + space
-            a_inter_b = a_inter_b.translate(translate_vect)
-            last_ymax = a_inter_b.objects[0].BoundingBox().ymax
-            res.add( a_inter_b) # add the intersection to the assebmly
-            if extrab_mask and len(extrab_mask) > ind and extrab_mask[ind] != '_':
-                res.add(cq.Workplane('XY')
-                        .circle(extrab_rad//2)
-                        .extrude(extrab_h)
-                        .translate(translate_vect)
-                        )
-        except:
-            last_ymax += space*1.5
+            results = list(letter_executor().map(_intersect_pair, jobs))
+        except BrokenProcessPool:
+            # a worker died, start a new pool next time and render here
+            letter_executor.clear()
+            results = [_intersect_pair(job) for job in jobs]
+    else:
+        results = [_intersect_pair(job) for job in jobs]
+    # stack the intersections along Y: every letter starts one space after the
+    # previous one, a letter that cannot be generated leaves a gap of 1.5 spaces
+    ok = np.array([result is not None for result in results], dtype=bool)
+    ymins = np.array([result[1] if result else 0 for result in results], dtype=float)
+    ylens = np.array([result[2] - result[1] if result else 0 for result in results], dtype=float)
+    lead = np.full(len(results), space, dtype=float)
+    lead[:1] = 0 # no space before the first letter
+    steps = np.where(ok, lead + ylens, space*1.5)
+    offsets = np.cumsum(steps) - steps + lead - ymins
+    # the extra bases are all the same cylinder, build it once and place copies
+    half_rad = extrab_rad//2
+    extra_base_ind = {i for i, m in enumerate(extrab_mask) if m != '_'} # letters with an extra base
+    base_cyl = None
+    # a zero radius or height gives no solid, the letters then have no extra base
+    if half_rad <= 0 or extrab_h <= 0:
+        extra_base_ind = set()
+    if extra_base_ind:
+        base_cyl = cq.Workplane('XY').circle(half_rad).extrude(extrab_h).val()
+    for ind, result in enumerate(results):
+        if result is None:
+            continue
+        translate_vect = [0, float(offsets[ind]), 0]
+        builder.Add(comp, result[0].translate(cq.Vector(*translate_vect)).wrapped) # add the intersection to the compound
+        if ind in extra_base_ind:
+            builder.Add(comp, base_cyl.located(cq.Location(cq.Vector(*translate_vect))).wrapped)
 
-    b_box = res.toCompound().BoundingBox() # calculate the bounding box
-    # add the base to the assembly
-    res.add(cq.Workplane()
+    b_box = cq.Shape.cast(comp).BoundingBox() # calculate the bounding box
+    # add the base to the letters
+    base = (cq.Workplane()
             .box(b_box.xlen+b_pad*2, b_box.ylen+b_pad*2, b_h, centered=(1,0,0))
             .translate([0, -b_pad, -b_h])
             .edges('|Z')
             .fillet(b_box.xlen/2*b_fil_per)
+            .val()
             )
-    # convert the assemly to a shape and center it
-    res = res.toCompound()
-    res = res.translate([0, -b_box.ylen/2,0])
+    builder.Add(comp, base.wrapped)
+    # center the shape
+    res = cq.Shape.cast(comp).translate([0, -b_box.ylen/2,0])
     # export the files
-    cq.exporters.export(res, f'file_display.stl')
-    cq.exporters.export(res, f"{export_name}.{save}")
+    export_files(res, save, export_name, display_name)
+
+@st.cache_resource(max_entries=32)
+def render_dual_text_bytes(text1, text2, font_path, save, b_h, b_pad, b_fil_per, space_per,
+                           extrab_h, extrab_rad, extrab_mask, fontsize):
+    """Render the dual text in a temporary folder and return the display and output files content"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        export_name = os.path.join(tmp_dir, 'file')
+        display_name = os.path.join(tmp_dir, 'file_display')
+        dual_text(text1, text2, fontPath=font_path, fontsize=fontsize, save=save,
+                  b_h=b_h, b_pad=b_pad, b_fil_per=b_fil_per, space_per=space_per,
+                  extrab_h=extrab_h, extrab_rad=extrab_rad, extrab_mask=extrab_mask,
+                  export_name=export_name, display_name=display_name)
+        with open(f'{display_name}.stl', 'rb') as file:
+            display_bytes = file.read()
+        with open(f'{export_name}.{save}', 'rb') as file:
+            output_bytes = file.read()
+    return display_bytes, output_bytes
+
+@st.cache_resource
+def cached_heart_with_text(heart_height, thickness, height, text, font_size,
+                           font_path, text_height, text_offset):
+    """Heart with text, kept in memory across reruns with the same parameters"""
+    from stlcreation.heartfile import create_heart_with_text, set_text_cache_dir
+    set_text_cache_dir(CACHE_DIR / 'text')
+    return create_heart_with_text(
+        heart_height=heart_height,
+        thickness=thickness,
+        height=height,
+        text=text,
+        font_size=font_size,
+        font_path=font_path,
+        text_height=text_height,
+        text_offset=text_offset
+        )
 
 def heartLampRendering(text1, text2, fontPath='', 
                       save='stl', 
@@ -99,14 +197,12 @@ def heartLampRendering(text1, text2, fontPath='',
                       export_name='file'):
     print(f"DEBUG: heartLampRendering called with text1='{text1}', text2='{text2}'")
     """Generate a heart-shaped lamp with dual text illusion"""
+    from stlcreation.heartfile import test_parameters
     space = fontsize*space_per
   #  res = cq.Assembly()
     last_ymax = 0
     
-    # Create heart-shaped base first
-   # Create heart-shaped base first
-    
-    heart_with_text = create_heart_with_text(
+    heart_params = dict(
     heart_height=500, 
     thickness=10, 
     height=15,
@@ -116,6 +212,23 @@ def heartLampRendering(text1, text2, fontPath='',
     text_height=10,
     text_offset=0.1
     )
+    # reuse the files rendered with the same parameters
+    key = hashlib.sha256(repr((CACHE_VERSION, sorted(heart_params.items()))).encode()).hexdigest()
+    # the display mesh is coarser than an stl output, it has its own file
+    cached_display = CACHE_DIR / f'heart_{key}_display.stl'
+    cached_file = CACHE_DIR / f'heart_{key}.{save}'
+    if cached_display.exists() and cached_file.exists():
+        shutil.copyfile(cached_display, 'file_display.stl')
+        shutil.copyfile(cached_file, f"{export_name}.{save}")
+        # mark them as recently used for prune_cache
+        os.utime(cached_display)
+        os.utime(cached_file)
+        return
+    
+    # Create heart-shaped base first
+   # Create heart-shaped base first
+    
+    heart_with_text = cached_heart_with_text(**heart_params)
     # bb = heart_with_text.val().BoundingBox()
     # length = bb.xlen
     # width = bb.ylen
@@ -126,8 +239,26 @@ def heartLampRendering(text1, text2, fontPath='',
     test_parameters()
     
     # Export files
-    cq.exporters.export(heart_with_text, f'file_display.stl')
-    cq.exporters.export(heart_with_text, f"{export_name}.{save}")
+    export_files(heart_with_text, save, export_name)
+    CACHE_DIR.mkdir(exist_ok=True)
+    shutil.copyfile('file_display.stl', cached_display)
+    shutil.copyfile(f"{export_name}.{save}", cached_file)
+    # a display and an output file per heart
+    prune_cache('heart_*', 2*MAX_CACHED_HEARTS)
+
+@st.fragment
+def _special_chars_panel(label, target_key):
+    """Text input with the special characters buttons, a click reruns only this panel"""
+    # typed text changes the warnings and the mask outside the panel, rerun the whole app
+    if st.session_state.pop(f'{target_key}_typed', False):
+        st.rerun()
+    st.text_input(label, key=target_key,
+                  on_change=lambda: setattr(st.session_state, f'{target_key}_typed', True))
+    special_chars = st.columns(len(SPECIAL_CHARS))
+    for i, char in enumerate(SPECIAL_CHARS):
+        with special_chars[i]:
+            st.button(char, key=f"btn_{target_key}_{char}",
+                      on_click=lambda c=char: setattr(st.session_state, target_key, st.session_state[target_key] + c))
 
 # Callback function for render button
 def on_render_click():
@@ -159,26 +290,13 @@ if __name__ == "__main__":
     col1, col2, col3 = st.columns(3)
     # Input type
     with col1:
-        text1 = st.text_input('First text', value=st.session_state.text1, key='text1_input')
-        st.session_state.text1 = text1  # Update session state
-        special_chars1 = st.columns(8)
-        for i, char in enumerate(SPECIAL_CHARS):
-            with special_chars1[i]:
-                if st.button(char, key=f"btn1_{char}"):
-                    st.session_state.text1 += char
-                    st.rerun()
+        _special_chars_panel('First text', 'text1')
+        text1 = st.session_state.text1
     with col2:
-        text2 = st.text_input('Second text', value=st.session_state.text2, key='text2_input')
-        st.session_state.text2 = text2  # Update session state
-        special_chars2 = st.columns(8)
-        for i, char in enumerate(SPECIAL_CHARS):
-            with special_chars2[i]:
-                if st.button(char, key=f"btn2_{char}"):
-                    st.session_state.text2 += char
-                    st.rerun()
+        _special_chars_panel('Second text', 'text2')
+        text2 = st.session_state.text2
     with col3:
         fontsize = st.number_input('Font size', min_value=1, max_value=None, value=20)
-        extr = fontsize*2 # extrude letter
 
     if len(text1) != len(text2):
         st.warning("The two texts don't have the same length, letters in excess will be cut", icon="⚠️")
@@ -188,11 +306,11 @@ if __name__ == "__main__":
     col1, col2, col3 = st.columns(3)
     # Input type 
     font_dir = get_fonts_path()
-    fonts = [f for f in os.listdir(font_dir) if '.' != f[0]]
+    fonts = list_fonts(str(font_dir))
     with col1:
-        font_name = st.selectbox('Select font', ['lato'] + sorted(fonts))
+        font_name = st.selectbox('Select font', ['lato'] + fonts)
     with col2:
-        font_type_list = [f for f in os.listdir(font_dir / font_name) if '.ttf' in f and '-' in f]
+        font_type_list = list_font_types(str(font_dir), font_name, '*-*.ttf')
         # font with explicit type (-bold, -regular, ...)
         if font_type_list:
             font_start_name = font_type_list[0].split('-')[0]
@@ -201,8 +319,8 @@ if __name__ == "__main__":
             font_type_pathname = font_start_name + '-' + font_type + '.ttf'
             font_path = font_dir / font_name / font_type_pathname
         else: # font without explicit type
-            font_type_list = [f for f in os.listdir(font_dir / font_name) if '.ttf' in f]
-            font_type = st.selectbox('Font type', sorted(font_type_list))
+            font_type_list = list_font_types(str(font_dir), font_name)
+            font_type = st.selectbox('Font type', font_type_list)
             font_path = font_dir / font_name / font_type
     with col3:
         space = st.slider('Letters space (%)', 0, 200, step=1, value=30) / 100
@@ -262,9 +380,13 @@ if __name__ == "__main__":
             # Use the session state value
             if st.session_state.rendering_method == "Regular":
                 print("DEBUG: Calling dual_text")
-                dual_text(text1, text2, fontPath=str(font_path), save=out, 
-                          b_h=b_h, b_pad=b_pad, b_fil_per=b_fil_per, space_per=space,
-                          extrab_h=extrab_h, extrab_rad=extrab_rad, extrab_mask=extra_mask)
+                display_bytes, output_bytes = render_dual_text_bytes(
+                    text1, text2, str(font_path), out, b_h, b_pad, b_fil_per, space,
+                    extrab_h, extrab_rad, extra_mask, fontsize)
+                with open('file_display.stl', 'wb') as file:
+                    file.write(display_bytes)
+                with open(f'file.{out}', 'wb') as file:
+                    file.write(output_bytes)
             else:  # Heart Lamp method
                 print("DEBUG: Calling heartLampRendering")
                 heartLampRendering(text1, text2, fontPath=str(font_path), save=out, 
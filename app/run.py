@@ -1,8 +1,11 @@
 import streamlit.web.cli as stcli
 from pathlib import Path
 import sys
+import multiprocessing
 
 if __name__ == "__main__":
+    # needed by the worker processes of the bundled executables
+    multiprocessing.freeze_support()
     sys.argv = [
         "streamlit",
         "run",
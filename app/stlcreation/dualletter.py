@@ -0,0 +1,85 @@
+import copyreg
+from io import BytesIO
+from functools import lru_cache
+import cadquery as cq
+from OCP.Standard import (Standard_Failure, Standard_ConstructionError, Standard_DomainError,
+                          Standard_NullObject, Standard_OutOfRange, Standard_TypeMismatch)
+from OCP.StdFail import StdFail_NotDone
+
+# the OCCT exceptions are all flat in OCP, none of them subclasses Standard_Failure;
+# ValueError and IndexError come from cadquery, IndexError when the font has no glyph
+_LETTER_ERRORS = (StdFail_NotDone, Standard_Failure, Standard_ConstructionError,
+                  Standard_DomainError, Standard_NullObject, Standard_OutOfRange,
+                  Standard_TypeMismatch, ValueError, IndexError)
+
+
+def _shape_reduce(shape):
+    """Pickle a shape through its BRep serialization"""
+    buffer = BytesIO()
+    shape.exportBrep(buffer)
+    return _shape_from_brep, (buffer.getvalue(),)
+
+def _shape_from_brep(data):
+    """Rebuild a shape pickled by _shape_reduce"""
+    return cq.Shape.importBrep(BytesIO(data))
+
+# shapes are sent back from the worker processes of dual_text
+for _shape_type in (cq.Shape, cq.Solid, cq.Compound):
+    copyreg.pickle(_shape_type, _shape_reduce)
+
+
+@lru_cache(maxsize=512)
+def _letter_cached(let, angle, fontPath, fontsize, extr):
+    """Extrude, center and rotate a letter, the result is shared between calls"""
+    wp = (cq.Workplane('XZ')
+        .text(let, fontsize, extr, fontPath=fontPath, valign='bottom')
+        )
+    b_box = wp.combine().objects[0].BoundingBox()
+    x_shift = -(b_box.xlen/2 + b_box.xmin )
+    wp = (wp.translate([x_shift,extr/2,0])
+        .rotate((0,0,0),(0,0,1),angle)
+        )
+    return wp
+
+@lru_cache(maxsize=512)
+def _letter_bbox(let, angle, fontPath, fontsize, extr):
+    """Bounding box of a letter, cached like the letter itself"""
+    return _letter_cached(let, angle, fontPath, fontsize, extr).val().BoundingBox()
+
+def _boxes_overlap(bb_a, bb_b):
+    """Check if two bounding boxes intersect"""
+    return (bb_a.xmin <= bb_b.xmax and bb_b.xmin <= bb_a.xmax and
+            bb_a.ymin <= bb_b.ymax and bb_b.ymin <= bb_a.ymax and
+            bb_a.zmin <= bb_b.zmax and bb_b.zmin <= bb_a.zmax)
+
+def letter(let, angle, fontPath, fontsize, extr):
+    """Extrude a letter, center it and rotate of the input angle"""
+    # return a copy so that the cached workplane is never modified
+    return _letter_cached(let, angle, fontPath, fontsize, extr).translate((0,0,0))
+
+def _intersect_pair(args):
+    """
+    Intersect the two letters of a pair, meant to be run in a worker process.
+
+    Parameters:
+    args (tuple): (letter_a, letter_b, fontPath, fontsize, extr)
+
+    Returns:
+    tuple: (shape, ymin, ymax) of the intersection, None if it failed
+    """
+    let_a, let_b, fontPath, fontsize, extr = args
+    try:
+        # disjoint letters cannot intersect, skip the boolean operation
+        if not _boxes_overlap(_letter_bbox(let_a, 45, fontPath, fontsize, extr),
+                              _letter_bbox(let_b, 135, fontPath, fontsize, extr)):
+            return None
+        a = letter(let_a, 45, fontPath, fontsize, extr)
+        b = letter(let_b, 135, fontPath, fontsize, extr)
+        a_inter_b = a & b
+        # an empty intersection is an empty compound, not an empty workplane
+        if not a_inter_b.solids().vals():
+            return None
+        b_box = a_inter_b.objects[0].BoundingBox()
+    except _LETTER_ERRORS:
+        return None
+    return a_inter_b.objects[0], b_box.ymin, b_box.ymax
@@ -1,44 +1,181 @@
 import cadquery as cq
+import hashlib
+import logging
 import math
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from functools import lru_cache
 from typing import List, Tuple
-def create_hollow_heart(heart_height=1.0, thickness=0.1, height=1.5):
+from OCP.gp import gp_Pnt
+from OCP.GC import GC_MakeArcOfCircle
+from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeEdge, BRepBuilderAPI_MakeWire
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+logger = logging.getLogger(__name__)
+
+_TEXT_ROTATION = 270 # degrees around Z applied to the extruded text
+_TEXT_CACHE_VERSION = 1 # bump when the text construction changes, the old BReps are then ignored
+_text_cache_dir = None # extruded texts on disk, disabled until set_text_cache_dir is called
+
+# Characters that typically have dots above them, lowercased for the lookup
+_DOTTED_CHARS = frozenset(c.lower() for c in ('i', 'j', 'ö', 'ä', 'ü', 'ï', 'İ', 'ĳ', 'ĭ', 'ı'))
+
+def _heart_wire(factor):
+    """
+    Build the closed heart outline directly from OCCT edges.
+    
+    Parameters:
+    factor (float): Scaling factor for the heart size
     
+    Returns:
+    TopoDS_Wire: Two lines meeting at the tip and two arcs for the lobes
+    """
+    tip = gp_Pnt(0, 0, 0)
+    top = gp_Pnt(2*factor, 2*factor, 0)
+    center = gp_Pnt(3.5*factor, 0, 0)
+    bottom = gp_Pnt(2*factor, -2*factor, 0)
+    edges = [
+        BRepBuilderAPI_MakeEdge(tip, top).Edge(),
+        BRepBuilderAPI_MakeEdge(GC_MakeArcOfCircle(top, gp_Pnt(4*factor, factor, 0), center).Value()).Edge(),
+        BRepBuilderAPI_MakeEdge(GC_MakeArcOfCircle(center, gp_Pnt(4*factor, -factor, 0), bottom).Value()).Edge(),
+        BRepBuilderAPI_MakeEdge(bottom, tip).Edge(),
+    ]
+    wire = BRepBuilderAPI_MakeWire()
+    for edge in edges:
+        wire.Add(edge)
+    return wire.Wire()
+
+@lru_cache(maxsize=32)
+def _create_hollow_heart_cached(heart_height, thickness, height):
+    """
+    Build the hollow heart solid, cached by create_hollow_heart.
+    
+    Returns:
+    cq.Solid: A hollow heart solid, never modify it in place
+    """
     factor = heart_height/5
+    # The wall is the outline with its inward offset as a hole, a single
+    # extrusion gives the hollow heart without any 3D operation on the solid
+    outer_wire = cq.Wire(_heart_wire(factor))
+    inner_wire = outer_wire.offset2D(-thickness, kind="intersection")[0]
+    
+    return cq.Solid.extrudeLinear(outer_wire, [inner_wire], cq.Vector(0, 0, -height))
+
+def create_hollow_heart(heart_height=1.0, thickness=0.1, height=1.5):
     """
     Create a hollow heart shape with consistent wall thickness.
     
     Parameters:
-    factor (float): Scaling factor for the heart size
+    heart_height (float): Size of the heart
     thickness (float): Wall thickness of the heart
     height (float): Height (extrusion depth) of the heart
     
     Returns:
     cq.Workplane: A hollow heart shape
     """
-    # Create the outer heart
-    outer = (
-        cq.Workplane("XY")
-        .lineTo(2*factor, 2*factor)
-        .threePointArc((4*factor, factor), (3.5*factor, 0))
-        .mirrorX()
-        .extrude(-height)
-    )
+    # Round the parameters so that equal floats share the same cache entry
+    heart = _create_hollow_heart_cached(round(heart_height, 6), round(thickness, 6), round(height, 6))
+    
+    return cq.Workplane("XY").add(heart.copy())
+def set_text_cache_dir(cache_dir):
+    """
+    Keep the extruded texts as BRep files in a folder, so that they survive the process.
     
-    # Create the inner heart (offset from outer)
-    inner = (
+    Parameters:
+    cache_dir (str or Path): Folder of the cached texts, None disables the disk cache
+    """
+    global _text_cache_dir
+    _text_cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+def _text_shape(text, font_size, font_path, text_height):
+    """
+    Extrude and rotate the text, the shape is kept on disk when a cache folder is set.
+    
+    Returns:
+    cq.Shape: The text shape, loaded from the disk cache when it is there
+    """
+    cached = None
+    if _text_cache_dir is not None:
+        key = f"{_TEXT_CACHE_VERSION}|{text}|{font_path}|{font_size}|{text_height}|{_TEXT_ROTATION}"
+        cached = _text_cache_dir / f"text_{hashlib.blake2b(key.encode()).hexdigest()[:16]}.brep"
+        if cached.exists():
+            return cq.Shape.importBrep(str(cached))
+    
+    shape = (
         cq.Workplane("XY")
-        .lineTo(2*factor, 2*factor)
-        .threePointArc((4*factor, factor), (3.5*factor, 0))
-        .mirrorX()
-        .offset2D(-thickness, kind="intersection")
-        .extrude(-height)
+        .text(text, font_size, text_height, fontPath=font_path)
+        .rotate((0, 0, 0), (0, 0, 1), _TEXT_ROTATION)
+        .findSolid()
     )
+    if cached is None:
+        return shape
+    # Write next to the final name first so that a concurrent reader never
+    # sees a partial file
+    _text_cache_dir.mkdir(parents=True, exist_ok=True)
+    partial = cached.with_suffix(f".{os.getpid()}.tmp")
+    shape.exportBrep(str(partial))
+    os.replace(partial, cached)
+    return shape
+
+@lru_cache(maxsize=32)
+def _text_solids_cached(text, font_size, font_path, text_height):
+    """
+    Extrude the text and analyze its solids, cached by _build_text_solids.
+    
+    Returns:
+    tuple: (text workplane, meta, bboxes, centers), never modify them in place
+    """
+    text_obj = cq.Workplane("XY").add(_text_shape(text, font_size, font_path, text_height))
+    # Walk the solids once, the packed arrays are what _classify_and_pair needs
+    solids = text_obj.solids().vals()
+    meta = []
+    bboxes = np.empty((len(solids), 6), dtype=np.float64)
+    centers = np.empty((len(solids), 3), dtype=np.float64)
+    for i, solid in enumerate(solids):
+        bbox = solid.BoundingBox()
+        center = ((bbox.xmin + bbox.xmax) / 2, 
+                 (bbox.ymin + bbox.ymax) / 2, 
+                 (bbox.zmin + bbox.zmax) / 2)
+        meta.append((solid, bbox, center))
+        bboxes[i] = (bbox.xmin, bbox.xmax, bbox.ymin, bbox.ymax, bbox.zmin, bbox.zmax)
+        centers[i] = center
+    bboxes.setflags(write=False)
+    centers.setflags(write=False)
     
-    # Subtract inner from outer to create hollow heart
-    heart = outer - inner
+    return text_obj, tuple(meta), bboxes, centers
+
+def _build_text_solids(text, font_size, font_path, text_height):
+    """
+    Create the 3D text shared by all the text objects, with its solids analyzed.
     
+    Parameters:
+    text (str): Text to create
+    font_size (float): Font size for the text
+    font_path (str): Path to font file
+    text_height (float): Extrusion height of the text
     
-    return heart
+    Returns:
+    tuple: (text workplane, ((solid, bbox, center), ...), bboxes, centers) where
+    bboxes (N, 6) holds xmin, xmax, ymin, ymax, zmin, zmax and centers (N, 3)
+    the centers of the solids of the text
+    """
+    # Blank text has no solids, do not load the font for it
+    if not text or not text.strip():
+        return cq.Workplane("XY"), (), np.empty((0, 6)), np.empty((0, 3))
+    # Round the height so that equal floats share the same cache entry
+    return _text_solids_cached(text, font_size, font_path, round(text_height, 6))
+
 def create_text_object(text="Love", font_size=10, font_path='', 
                       text_height=0.5, position=(0, 0, 0)):
     """
@@ -54,14 +191,9 @@ def create_text_object(text="Love", font_size=10, font_path='',
     Returns:
     cq.Workplane: A 3D text object
     """
-    text_obj = (
-        cq.Workplane("XY")
-        .text(text, font_size, text_height, fontPath=font_path)
-        .rotate((0, 0, 0), (0, 0, 1), 270)  # Rotate 90 degrees around Z-axis
-        .translate(position)
-    )
+    text_obj, _, _, _ = _build_text_solids(text, font_size, font_path, text_height)
     
-    return text_obj
+    return text_obj.translate(position)
 def create_heart_with_text(heart_height=1.0, thickness=0.1, height=1.5, 
                           text="Love", font_size=100, font_path='', 
                           text_height=0.5, text_offset=0.0):
@@ -84,6 +216,10 @@ def create_heart_with_text(heart_height=1.0, thickness=0.1, height=1.5,
     # Create the hollow heart
     heart = create_hollow_heart(heart_height, thickness, height)
     
+    # Nothing to engrave, skip the font loading and the union
+    if not text or not text.strip():
+        return heart
+    
     bbHeart = heart.val().BoundingBox()
     length = bbHeart.xlen
     width = bbHeart.ylen
@@ -129,19 +265,13 @@ def create_text_object_with_bridges(text="Love", font_size=10, font_path='',
     Returns:
     cq.Workplane: A 3D text object with bridges
     """
-    # Characters that typically have dots above them
-    dotted_chars = ['i', 'j', 'ö', 'ä', 'ü', 'ï', 'İ', 'ĳ', 'ĭ', 'ı']
-    
     # Create the main text object
-    text_obj = (
-        cq.Workplane("XY")
-        .text(text, font_size, text_height, fontPath=font_path)
-        .rotate((0, 0, 0), (0, 0, 1), 270)  # Rotate 90 degrees around Z-axis
-    )
+    text_obj, _, _, _ = _build_text_solids(text, font_size, font_path, text_height)
     
     # Find positions where we might need bridges
+    bridges = []
     for i, char in enumerate(text):
-        if char.lower() in [c.lower() for c in dotted_chars]:
+        if char.lower() in _DOTTED_CHARS:
             # Estimate position of this character (approximate based on font size)
             char_x_offset = i * font_size * 0.6  # Rough estimate, may need adjustment
             
@@ -154,14 +284,38 @@ def create_text_object_with_bridges(text="Love", font_size=10, font_path='',
                 .translate((char_x_offset, font_size * 0.7, text_height - bridge_height))
             )
             
-            # Add the bridge to the main text
-            text_obj = text_obj.union(bridge)
+            # Collect the bridge, they are fused all together at the end
+            bridges.append(bridge.val())
+    
+    # Fuse all the bridges in a single boolean operation
+    if bridges:
+        text_obj = text_obj.union(cq.Workplane("XY").add(bridges))
     
     # Apply final translation
     text_obj = text_obj.translate(position)
     
     return text_obj
 
+def _make_bridge(start, end, diameter, max_length=math.inf):
+    """
+    Create a cylindrical bridge going from the start point to the end point.
+    
+    Parameters:
+    start (tuple): Point (x, y, z) where the bridge starts
+    end (tuple): Point (x, y, z) where the bridge ends
+    diameter (float): Diameter of the bridge
+    max_length (float): Bridges at least this long are not created
+    
+    Returns:
+    cq.Solid: The bridge, None if the points coincide or are too far apart
+    """
+    bridge_vector = cq.Vector(end[0] - start[0], end[1] - start[1], end[2] - start[2])
+    bridge_length = bridge_vector.Length
+    if not 0 < bridge_length < max_length:
+        return None
+    
+    return cq.Solid.makeCylinder(diameter / 2, bridge_length, cq.Vector(*start), bridge_vector.normalized())
+
 # Alternative: More precise method using bounding boxes
 def create_text_object_precise_bridges(text="Love", font_size=10, font_path='', 
                                      text_height=0.5, position=(0, 0, 0),
@@ -169,19 +323,11 @@ def create_text_object_precise_bridges(text="Love", font_size=10, font_path='',
     """
     More precise method that analyzes the geometry to find dots and add bridges.
     """
-    # Create the main text
-    text_obj = (
-        cq.Workplane("XY")
-        .text(text, font_size, text_height, fontPath=font_path)
-        .rotate((0, 0, 0), (0, 0, 1), 270)
-    )
+    # Create the main text, its solids come with their bounding box
+    text_obj, meta, _, _ = _build_text_solids(text, font_size, font_path, text_height)
+    bridges = []
     
-    # Get all solids and analyze them
-    solids = text_obj.solids().vals()
-    
-    for solid in solids:
-        # Get bounding box to determine if this might be a dot
-        bbox = solid.BoundingBox()
+    for solid, bbox, center in meta:
         width = bbox.xlen
         height = bbox.ylen
         depth = bbox.zlen
@@ -191,37 +337,85 @@ def create_text_object_precise_bridges(text="Love", font_size=10, font_path='',
             bbox.ymax > font_size * 0.4):  # Dots are usually high on Y-axis
             
             # Find the center of the dot
-            dot_center = ((bbox.xmin + bbox.xmax) / 2, 
-                         (bbox.ymin + bbox.ymax) / 2, 
-                         (bbox.zmin + bbox.zmax) / 2)
+            dot_center = center
             
             # Find the nearest main character part (simplified approach)
             # Look for the closest point in the main text body
             main_body_center = (dot_center[0], dot_center[1] - font_size * 0.3, dot_center[2])
             
             # Create a cylindrical bridge between dot and main body
-            bridge_vector = (main_body_center[0] - dot_center[0],
-                           main_body_center[1] - dot_center[1],
-                           main_body_center[2] - dot_center[2])
-            
-            bridge_length = math.sqrt(bridge_vector[0]**2 + bridge_vector[1]**2 + bridge_vector[2]**2)
+            bridge = _make_bridge(dot_center, main_body_center, bridge_diameter)
             
-            if bridge_length > 0:
-                # Create a cylinder bridge
-                bridge = (
-                    cq.Workplane("XY")
-                    .circle(bridge_diameter / 2)
-                    .extrude(bridge_length)
-                    .translate((0, 0, -bridge_length / 2))
-                    .rotate((0, 0, 0), (0, 1, 0), -math.degrees(math.atan2(bridge_vector[0], bridge_vector[2])))
-                    .rotate((0, 0, 0), (1, 0, 0), math.degrees(math.atan2(bridge_vector[1], math.sqrt(bridge_vector[0]**2 + bridge_vector[2]**2))))
-                    .translate(dot_center)
-                )
-                
-                text_obj = text_obj.union(bridge)
+            if bridge is not None:
+                bridges.append(bridge)
+    
+    # Fuse all the bridges in a single boolean operation
+    if bridges:
+        text_obj = text_obj.union(cq.Workplane("XY").add(bridges))
     
     return text_obj.translate(position)
 
+@njit(cache=True)
+def _classify_and_pair(bboxes, centers, avg_width, avg_height, text_height,
+                       dot_size_ratio, dot_min_size, dot_max_size,
+                       max_horizontal_offset, max_distance, require_below_dot):
+    """
+    Separate the dots from the main characters and find the base of each dot.
+    
+    Parameters:
+    bboxes (np.ndarray): (N, 6) xmin, xmax, ymin, ymax, zmin, zmax of the solids
+    centers (np.ndarray): (N, 3) centers of the solids
+    avg_width (float): Average width of the solids
+    avg_height (float): Average height of the solids
+    text_height (float): Extrusion height of the text
+    dot_size_ratio (float): Max size of a dot relative to average
+    dot_min_size (float): Minimum size to be considered a dot
+    dot_max_size (float): Maximum size to be considered a dot
+    max_horizontal_offset (float): Max horizontal distance between a dot and its base
+    max_distance (float): Max distance between a dot and its base
+    require_below_dot (bool): Base must be below the dot
+    
+    Returns:
+    tuple: (is_dot, base_index, distance) per solid, base_index is -1 without a base
+    """
+    n = bboxes.shape[0]
+    is_dot = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        width = bboxes[i, 1] - bboxes[i, 0]
+        height = bboxes[i, 3] - bboxes[i, 2]
+        depth = bboxes[i, 5] - bboxes[i, 4]
+        # Most solids are main characters, the depth check rejects them first
+        is_dot[i] = (abs(depth - text_height) < 1e-6 and
+                     width < avg_width * dot_size_ratio and
+                     height < avg_height * dot_size_ratio and
+                     dot_min_size < width < dot_max_size and
+                     dot_min_size < height < dot_max_size)
+    
+    # Compare squared distances, the square root is only taken for the winners
+    max_distance2 = max_distance * max_distance
+    base_index = np.full(n, -1, dtype=np.int64)
+    distance = np.full(n, np.inf)
+    for i in range(n):
+        if not is_dot[i]:
+            continue
+        # Starting at the limit, one comparison checks the limit and the closest so far
+        min_d2 = max_distance2
+        for j in range(n):
+            if is_dot[j]:
+                continue
+            dx = centers[j, 0] - centers[i, 0]
+            dy = centers[j, 1] - centers[i, 1]  # Negative if char is below dot
+            if abs(dx) >= max_horizontal_offset or (require_below_dot and dy >= 0):
+                continue
+            d2 = dx * dx + dy * dy
+            if d2 < min_d2:
+                min_d2 = d2
+                base_index[i] = j
+        if base_index[i] >= 0:
+            distance[i] = math.sqrt(min_d2)
+    
+    return is_dot, base_index, distance
+
 def create_text_object_with_debug(text="äöi", font_size=100, font_path='', 
                                  text_height=10, position=(0, 0, 0),
                                  bridge_height=1.0, bridge_diameter=4.0,
@@ -230,128 +424,75 @@ def create_text_object_with_debug(text="äöi", font_size=100, font_path='',
     Create a 3D text object with bridges between dots and their base characters.
     Includes debugging visualization.
     """
-    # Create the main text
-    text_obj = (
-        cq.Workplane("XY")
-        .text(text, font_size, text_height, fontPath=font_path)
-        .rotate((0, 0, 0), (0, 0, 1), 270)
-    )
-    
-    if debug:
-        print(f"Processing text: '{text}'")
-        print(f"Font size: {font_size}, Text height: {text_height}")
+    # Create the main text, its solids come with their bounding box
+    text_obj, meta, bboxes, centers = _build_text_solids(text, font_size, font_path, text_height)
     
-    # Get all solids and analyze them
-    solids = text_obj.solids().vals()
+    # Checked once, the dot loop below only reads the flag
+    _dbg = logger.isEnabledFor(logging.DEBUG)
     
-    if debug:
-        print(f"Found {len(solids)} solids in the text")
+    if _dbg:
+        logger.debug("Processing text: '%s'", text)
+        logger.debug("Font size: %s, Text height: %s", font_size, text_height)
+        logger.debug("Found %d solids in the text", len(meta))
     
     # Calculate average character size for better detection
-    avg_width = sum(solid.BoundingBox().xlen for solid in solids) / len(solids)
-    avg_height = sum(solid.BoundingBox().ylen for solid in solids) / len(solids)
-    
-    if debug:
-        print(f"Average character size: {avg_width:.2f} x {avg_height:.2f}")
-    
-    # Separate dots from main characters
-    dots = []
-    main_chars = []
-    
-    for i, solid in enumerate(solids):
-        bbox = solid.BoundingBox()
-        width = bbox.xlen
-        height = bbox.ylen
-        depth = bbox.zlen
-        center = ((bbox.xmin + bbox.xmax) / 2, 
-                 (bbox.ymin + bbox.ymax) / 2, 
-                 (bbox.zmin + bbox.zmax) / 2)
-        
-        if debug:
-            print(f"Solid {i}: center={center}, size=({width:.2f}, {height:.2f}, {depth:.2f}), ymax={bbox.ymax:.2f}")
-        
-        # Much more lenient dot detection criteria
-        # Look for small, isolated elements that could be dots
-        is_dot = (width < avg_width * 0.4 and    # Significantly smaller than average width
-                 height < avg_height * 0.4 and   # Significantly smaller than average height
-                 depth == text_height and        # Same depth as text
-                 width > 0.1 and height > 0.1)   # Not just a line or artifact
-        
-        if is_dot:
-            dots.append((solid, center, bbox))
-            if debug:
-                print(f"  → Identified as DOT (size ratio: {width/avg_width:.2f}, {height/avg_height:.2f})")
-        else:
-            main_chars.append((solid, center, bbox))
-            if debug:
-                print(f"  → Identified as MAIN CHARACTER")
-    
-    if debug:
-        print(f"Found {len(dots)} dots and {len(main_chars)} main characters")
-        for i, (dot, center, bbox) in enumerate(dots):
-            print(f"Dot {i}: center={center}, size=({bbox.xlen:.2f}, {bbox.ylen:.2f})")
-    
-    # For each dot, find the closest main character and create a bridge
+    avg_width, avg_height = (bboxes[:, [1, 3]] - bboxes[:, [0, 2]]).mean(axis=0)  # x and y extents
+    
+    logger.debug("Average character size: %.2f x %.2f", avg_width, avg_height)
+    
+    # Small elements of the text depth that are not just a line or artifact are dots
+    is_dot, base_index, base_distance = _classify_and_pair(
+        bboxes, centers, avg_width, avg_height, text_height,
+        0.4, 0.1, math.inf,
+        # The base is below and horizontally aligned with the dot
+        font_size * 0.8, font_size * 2, True)
+    
+    if _dbg:
+        for i, (solid, bbox, center) in enumerate(meta):
+            logger.debug("Solid %d: center=%s, size=(%.2f, %.2f, %.2f), ymax=%.2f",
+                         i, center, bbox.xlen, bbox.ylen, bbox.zlen, bbox.ymax)
+            if is_dot[i]:
+                logger.debug("  → Identified as DOT (size ratio: %.2f, %.2f)",
+                             bbox.xlen/avg_width, bbox.ylen/avg_height)
+            else:
+                logger.debug("  → Identified as MAIN CHARACTER")
+        dot_indices = np.flatnonzero(is_dot)
+        logger.debug("Found %d dots and %d main characters", len(dot_indices), len(meta) - len(dot_indices))
+        for i, index in enumerate(dot_indices):
+            _, bbox, center = meta[index]
+            logger.debug("Dot %d: center=%s, size=(%.2f, %.2f)", i, center, bbox.xlen, bbox.ylen)
+    
+    # For each dot, create a bridge to its closest main character
     debug_objects = []
+    bridges = []
     bridges_created = 0
     
-    for dot_solid, dot_center, dot_bbox in dots:
-        if debug:
-            print(f"\nProcessing dot at {dot_center}")
-        
-        # Find the closest main character to this dot
-        closest_char = None
-        min_distance = float('inf')
+    for i in np.flatnonzero(is_dot):
+        dot_solid, dot_bbox, dot_center = meta[i]
+        if _dbg:
+            logger.debug("Processing dot at %s", dot_center)
         
-        for char_solid, char_center, char_bbox in main_chars:
-            # Calculate distance (consider both position and size)
-            distance = math.sqrt((char_center[0] - dot_center[0])**2 + 
-                                (char_center[1] - dot_center[1])**2)
+        # A base was found below and horizontally aligned with this dot
+        if base_index[i] >= 0:
+            char_solid, char_bbox, char_center = meta[base_index[i]]
+            min_distance = base_distance[i]
             
-            # Also check if this character is likely to be the base (should be below the dot)
-            is_likely_base = (char_center[1] < dot_center[1] and  # Character is below dot
-                             abs(char_center[0] - dot_center[0]) < font_size * 0.8)  # Horizontally aligned
-            
-            if debug:
-                print(f"  Distance to main char at {char_center}: {distance:.2f}, likely base: {is_likely_base}")
-            
-            if is_likely_base and distance < min_distance:
-                min_distance = distance
-                closest_char = (char_solid, char_center, char_bbox)
-        
-        if closest_char and min_distance < font_size * 2:
-            char_solid, char_center, char_bbox = closest_char
-            
-            if debug:
-                print(f"  Closest main character at {char_center}, distance: {min_distance:.2f}")
+            if _dbg:
+                logger.debug("  Closest main character at %s, distance: %.2f", char_center, min_distance)
             
             # Find connection points - dot bottom and character top
             dot_bottom = (dot_center[0], dot_bbox.ymin, text_height / 2)
             char_top = (char_center[0], char_bbox.ymax, text_height / 2)
             
             # Create a bridge between dot bottom and character top
-            bridge_vector = (char_top[0] - dot_bottom[0],
-                           char_top[1] - dot_bottom[1],
-                           char_top[2] - dot_bottom[2])
+            bridge = _make_bridge(dot_bottom, char_top, bridge_diameter, font_size * 2)
             
-            bridge_length = math.sqrt(bridge_vector[0]**2 + bridge_vector[1]**2 + bridge_vector[2]**2)
-            
-            if bridge_length > 0 and bridge_length < font_size * 2:
-                if debug:
-                    print(f"  Creating bridge of length {bridge_length:.2f} from {dot_bottom} to {char_top}")
+            if bridge is not None:
+                if _dbg:
+                    logger.debug("  Creating bridge of length %.2f from %s to %s",
+                                 math.dist(dot_bottom, char_top), dot_bottom, char_top)
                 
-                # Create cylindrical bridge
-                bridge = (
-                    cq.Workplane("XY")
-                    .circle(bridge_diameter / 2)
-                    .extrude(bridge_length)
-                    .translate((0, 0, -bridge_length / 2))
-                    .rotate((0, 0, 0), (0, 1, 0), -math.degrees(math.atan2(bridge_vector[0], bridge_vector[2])))
-                    .rotate((0, 0, 0), (1, 0, 0), math.degrees(math.atan2(bridge_vector[1], math.sqrt(bridge_vector[0]**2 + bridge_vector[2]**2))))
-                    .translate(dot_bottom)
-                )
-                
-                text_obj = text_obj.union(bridge)
+                bridges.append(bridge)
                 bridges_created += 1
                 
                 if debug:
@@ -364,20 +505,23 @@ def create_text_object_with_debug(text="äöi", font_size=100, font_path='',
                     )
                     debug_objects.append(debug_sphere)
     
-    if debug:
-        print(f"Created {bridges_created} bridges")
+    # Fuse all the bridges in a single boolean operation
+    if bridges:
+        text_obj = text_obj.union(cq.Workplane("XY").add(bridges))
+    
+    logger.debug("Created %d bridges", bridges_created)
     
-    # Add debug objects if enabled
+    # Add debug objects if enabled, they are only markers so no boolean is needed
     if debug and debug_objects:
-        debug_obj = debug_objects[0]
-        for obj in debug_objects[1:]:
-            debug_obj = debug_obj.union(obj)
-        text_obj = text_obj.union(debug_obj)
+        debug_compound = cq.Compound.makeCompound([obj.val() for obj in debug_objects])
+        # newObject rather than add, which would modify the workplane in place
+        text_obj = text_obj.newObject(text_obj.vals() + [debug_compound])
     
     return text_obj.translate(position)
 
 # Test with your specific case
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     text_with_bridges = create_text_object_with_debug(
         text="äöi", 
         font_size=100, 
@@ -412,140 +556,80 @@ def create_text_object_with_tunable_params(text="üäöi", font_size=100, font_p
     Create a 3D text object with bridges between dots and their base characters.
     Includes tunable parameters for fine-tuning.
     """
-    # Create the main text
-    text_obj = (
-        cq.Workplane("XY")
-        .text(text, font_size, text_height, fontPath=font_path)
-        .rotate((0, 0, 0), (0, 0, 1), 270)
-    )
+    # Create the main text, its solids come with their bounding box
+    text_obj, meta, bboxes, centers = _build_text_solids(text, font_size, font_path, text_height)
     
-    if debug:
-        print(f"Processing text: '{text}'")
-        print(f"Font size: {font_size}, Text height: {text_height}")
-        print(f"Tunable params: dot_size_ratio={dot_size_ratio}, dot_min_size={dot_min_size}, "
-              f"dot_max_size={dot_max_size}, max_horizontal_offset={max_horizontal_offset}")
+    # Checked once, the dot loop below only reads the flag
+    _dbg = logger.isEnabledFor(logging.DEBUG)
     
-    # Get all solids and analyze them
-    solids = text_obj.solids().vals()
-    
-    if debug:
-        print(f"Found {len(solids)} solids in the text")
+    if _dbg:
+        logger.debug("Processing text: '%s'", text)
+        logger.debug("Font size: %s, Text height: %s", font_size, text_height)
+        logger.debug("Tunable params: dot_size_ratio=%s, dot_min_size=%s, dot_max_size=%s, "
+                     "max_horizontal_offset=%s", dot_size_ratio, dot_min_size, dot_max_size,
+                     max_horizontal_offset)
+        logger.debug("Found %d solids in the text", len(meta))
     
     # Calculate average character size for better detection
-    if solids:
-        avg_width = sum(solid.BoundingBox().xlen for solid in solids) / len(solids)
-        avg_height = sum(solid.BoundingBox().ylen for solid in solids) / len(solids)
+    if meta:
+        avg_width, avg_height = (bboxes[:, [1, 3]] - bboxes[:, [0, 2]]).mean(axis=0)  # x and y extents
     else:
         avg_width, avg_height = font_size, font_size
     
-    if debug:
-        print(f"Average character size: {avg_width:.2f} x {avg_height:.2f}")
-    
-    # Separate dots from main characters
-    dots = []
-    main_chars = []
-    
-    for i, solid in enumerate(solids):
-        bbox = solid.BoundingBox()
-        width = bbox.xlen
-        height = bbox.ylen
-        depth = bbox.zlen
-        center = ((bbox.xmin + bbox.xmax) / 2, 
-                 (bbox.ymin + bbox.ymax) / 2, 
-                 (bbox.zmin + bbox.zmax) / 2)
-        
-        if debug:
-            print(f"Solid {i}: center={center}, size=({width:.2f}, {height:.2f}, {depth:.2f}), ymax={bbox.ymax:.2f}")
-        
-        # Tunable dot detection criteria
-        size_ratio_ok = (width < avg_width * dot_size_ratio and 
-                        height < avg_height * dot_size_ratio)
-        absolute_size_ok = (width > dot_min_size and height > dot_min_size and
-                           width < dot_max_size and height < dot_max_size)
-        depth_ok = (depth == text_height)
-        
-        is_dot = size_ratio_ok and absolute_size_ok and depth_ok
-        
-        if is_dot:
-            dots.append((solid, center, bbox))
-            if debug:
-                print(f"  → Identified as DOT (size ratio: {width/avg_width:.2f}, {height/avg_height:.2f})")
-        else:
-            main_chars.append((solid, center, bbox))
-            if debug:
-                print(f"  → Identified as MAIN CHARACTER")
-    
-    if debug:
-        print(f"Found {len(dots)} dots and {len(main_chars)} main characters")
-        for i, (dot, center, bbox) in enumerate(dots):
-            print(f"Dot {i}: center={center}, size=({bbox.xlen:.2f}, {bbox.ylen:.2f})")
-    
-    # For each dot, find the closest main character and create a bridge
+    logger.debug("Average character size: %.2f x %.2f", avg_width, avg_height)
+    
+    # Tunable dot detection criteria
+    is_dot, base_index, base_distance = _classify_and_pair(
+        bboxes, centers, avg_width, avg_height, text_height,
+        dot_size_ratio, dot_min_size, dot_max_size,
+        max_horizontal_offset, max_vertical_distance, require_below_dot)
+    
+    if _dbg:
+        for i, (solid, bbox, center) in enumerate(meta):
+            logger.debug("Solid %d: center=%s, size=(%.2f, %.2f, %.2f), ymax=%.2f",
+                         i, center, bbox.xlen, bbox.ylen, bbox.zlen, bbox.ymax)
+            if is_dot[i]:
+                logger.debug("  → Identified as DOT (size ratio: %.2f, %.2f)",
+                             bbox.xlen/avg_width, bbox.ylen/avg_height)
+            else:
+                logger.debug("  → Identified as MAIN CHARACTER")
+        dot_indices = np.flatnonzero(is_dot)
+        logger.debug("Found %d dots and %d main characters", len(dot_indices), len(meta) - len(dot_indices))
+        for i, index in enumerate(dot_indices):
+            _, bbox, center = meta[index]
+            logger.debug("Dot %d: center=%s, size=(%.2f, %.2f)", i, center, bbox.xlen, bbox.ylen)
+    
+    # For each dot, create a bridge to its closest main character
     debug_objects = []
+    bridges = []
     bridges_created = 0
     
-    for dot_solid, dot_center, dot_bbox in dots:
-        if debug:
-            print(f"\nProcessing dot at {dot_center}")
-        
-        # Find the closest main character to this dot
-        closest_char = None
-        min_distance = float('inf')
-        
-        for char_solid, char_center, char_bbox in main_chars:
-            # Calculate distances
-            horizontal_distance = abs(char_center[0] - dot_center[0])
-            vertical_distance = char_center[1] - dot_center[1]  # Negative if char is below dot
-            
-            # Check if this character could be the base
-            horizontal_ok = horizontal_distance < max_horizontal_offset
-            vertical_ok = (not require_below_dot or vertical_distance < 0)  # Below dot if required
-            distance_ok = math.sqrt(horizontal_distance**2 + vertical_distance**2) < max_vertical_distance
-            
-            if horizontal_ok and vertical_ok and distance_ok:
-                distance = math.sqrt(horizontal_distance**2 + vertical_distance**2)
-                
-                if debug:
-                    print(f"  Potential base at {char_center}: dist={distance:.2f}, "
-                          f"h={horizontal_distance:.2f}, v={vertical_distance:.2f}")
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_char = (char_solid, char_center, char_bbox)
+    for i in np.flatnonzero(is_dot):
+        dot_solid, dot_bbox, dot_center = meta[i]
+        if _dbg:
+            logger.debug("Processing dot at %s", dot_center)
         
-        if closest_char:
-            char_solid, char_center, char_bbox = closest_char
+        # A base was found within the tunable limits
+        if base_index[i] >= 0:
+            char_solid, char_bbox, char_center = meta[base_index[i]]
+            min_distance = base_distance[i]
             
-            if debug:
-                print(f"  Selected base at {char_center}, distance: {min_distance:.2f}")
+            if _dbg:
+                logger.debug("  Selected base at %s, distance: %.2f", char_center, min_distance)
             
             # Find connection points - dot bottom and character top
             dot_bottom = (dot_center[0], dot_bbox.ymin, text_height / 2)
             char_top = (char_center[0], char_bbox.ymax, text_height / 2)
             
             # Create a bridge between dot bottom and character top
-            bridge_vector = (char_top[0] - dot_bottom[0],
-                           char_top[1] - dot_bottom[1],
-                           char_top[2] - dot_bottom[2])
-            
-            bridge_length = math.sqrt(bridge_vector[0]**2 + bridge_vector[1]**2 + bridge_vector[2]**2)
+            bridge = _make_bridge(dot_bottom, char_top, bridge_diameter, max_vertical_distance)
             
-            if bridge_length > 0 and bridge_length < max_vertical_distance:
-                if debug:
-                    print(f"  Creating bridge of length {bridge_length:.2f} from {dot_bottom} to {char_top}")
-                
-                # Create cylindrical bridge
-                bridge = (
-                    cq.Workplane("XY")
-                    .circle(bridge_diameter / 2)
-                    .extrude(bridge_length)
-                    .translate((0, 0, -bridge_length / 2))
-                    .rotate((0, 0, 0), (0, 1, 0), -math.degrees(math.atan2(bridge_vector[0], bridge_vector[2])))
-                    .rotate((0, 0, 0), (1, 0, 0), math.degrees(math.atan2(bridge_vector[1], math.sqrt(bridge_vector[0]**2 + bridge_vector[2]**2))))
-                    .translate(dot_bottom)
-                )
+            if bridge is not None:
+                if _dbg:
+                    logger.debug("  Creating bridge of length %.2f from %s to %s",
+                                 math.dist(dot_bottom, char_top), dot_bottom, char_top)
                 
-                text_obj = text_obj.union(bridge)
+                bridges.append(bridge)
                 bridges_created += 1
                 
                 if debug:
@@ -558,18 +642,39 @@ def create_text_object_with_tunable_params(text="üäöi", font_size=100, font_p
                     )
                     debug_objects.append(debug_sphere)
     
-    if debug:
-        print(f"Created {bridges_created} bridges")
+    # Fuse all the bridges in a single boolean operation
+    if bridges:
+        text_obj = text_obj.union(cq.Workplane("XY").add(bridges))
+    
+    logger.debug("Created %d bridges", bridges_created)
     
-    # Add debug objects if enabled
+    # Add debug objects if enabled, they are only markers so no boolean is needed
     if debug and debug_objects:
-        debug_obj = debug_objects[0]
-        for obj in debug_objects[1:]:
-            debug_obj = debug_obj.union(obj)
-        text_obj = text_obj.union(debug_obj)
+        debug_compound = cq.Compound.makeCompound([obj.val() for obj in debug_objects])
+        # newObject rather than add, which would modify the workplane in place
+        text_obj = text_obj.newObject(text_obj.vals() + [debug_compound])
     
     return text_obj.translate(position)
 
+def _build_and_export(i, test_text, params):
+    """Build the text with one parameter set of test_parameters and export it"""
+    print(f"\n{'='*60}")
+    print(f"Testing parameter set {i+1}: {params}")
+    print(f"{'='*60}")
+    
+    text_obj = create_text_object_with_tunable_params(
+        text=test_text,
+        font_size=100,
+        text_height=10,
+        bridge_height=1.0,
+        bridge_diameter=4.0,
+        debug=True,
+        **params
+    )
+    
+    cq.exporters.export(text_obj, f"test_params_{i+1}.stl")
+    print(f"Exported to test_params_{i+1}.stl")
+
 def test_parameters():
     test_text = "üäöi"
     
@@ -581,22 +686,26 @@ def test_parameters():
         {"dot_size_ratio": 0.6, "dot_min_size": 1.0, "dot_max_size": 40.0, "max_horizontal_offset": 120.0, "require_below_dot": False},
     ]
     
-    for i, params in enumerate(parameter_sets):
-        print(f"\n{'='*60}")
-        print(f"Testing parameter set {i+1}: {params}")
-        print(f"{'='*60}")
-        
-        text_obj = create_text_object_with_tunable_params(
-            text=test_text,
-            font_size=100,
-            text_height=10,
-            bridge_height=1.0,
-            bridge_diameter=4.0,
-            debug=True,
-            **params
-        )
+    # The workers load the text from the disk cache, a temporary one when none is set
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = _text_cache_dir if _text_cache_dir is not None else Path(tmp_dir)
+        previous_cache_dir = _text_cache_dir
+        set_text_cache_dir(cache_dir)
+        try:
+            # Extrude the text once here, instead of all the workers racing on it
+            _text_shape(test_text, 100, '', 10)
+        finally:
+            set_text_cache_dir(previous_cache_dir)
         
-        cq.exporters.export(text_obj, f"test_params_{i+1}.stl")
-        print(f"Exported to test_params_{i+1}.stl")
+        # The builds are independent, run them all at once. spawn rather than
+        # fork, this also runs inside the multi-threaded app server
+        with ProcessPoolExecutor(max_workers=len(parameter_sets),
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=set_text_cache_dir,
+                                 initargs=(cache_dir,)) as executor:
+            futures = [executor.submit(_build_and_export, i, test_text, params)
+                       for i, params in enumerate(parameter_sets)]
+            for future in futures:
+                future.result()
 
    
\ No newline at end of file